@@ -1,15 +1,60 @@
 import string
+import itertools
+import orjson
 import requests
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from friend_circle_lite.utils.cache import load_cache, save_cache
+from friend_circle_lite.utils.session import create_session
 from friend_circle_lite.single_friend import process_friend
 from friend_circle_lite import HEADERS_JSON, timeout
 
-def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int = 5, cache_file: str = None):
+# 全局同时进行的订阅探测请求上限，与 create_session 的连接池大小一致
+PROBE_WORKERS = 64
+
+def _apply_cache_update(cache_map: dict, upd: dict, manual_name_set: set) -> bool:
+    """
+    将 process_friend 返回的缓存更新意图应用到 cache_map。
+
+    手动 YAML 条目不允许被覆盖，且只缓存有效的 RSS 地址。
+    地址未变、仅刷新 etag / 文章等订阅状态时静默更新，不计入缓存更新。
+
+    返回：
+        bool: 是否新增、变更或删除了缓存的订阅地址。
+    """
+    if not upd:
+        return False
+
+    name = upd.get('name')
+    action = upd.get('action')
+    url = upd.get('url')
+    if not name or name in manual_name_set:
+        return False
+
+    if action == 'set' and url and url != 'none':
+        previous = cache_map.get(name)
+        cache_map[name] = {
+            'name': name,
+            'url': url,
+            'source': 'cache',
+            'etag': upd.get('etag'),
+            'last_modified': upd.get('last_modified'),
+            'articles': upd.get('articles', []),
+        }
+        if previous is not None and previous.get('url') == url:
+            return False
+        logging.info("缓存更新：SET %s -> %s (%s)", name, url, upd.get('reason', ''))
+        return True
+
+    if action == 'delete' and cache_map.pop(name, None) is not None:
+        logging.info("缓存更新：DELETE %s (%s)", name, upd.get('reason', ''))
+        return True
+
+    return False
+
+def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int = 5, cache_file: str = None, max_workers: int = 20, session: requests.Session = None):
     """
     读取 JSON 数据并处理订阅信息，返回统计数据和文章信息。
 
@@ -18,6 +63,8 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
         count (int): 获取每个博客的最大文章数。
         specific_RSS (list): 包含特定 RSS 源的字典列表 [{name, url}]（来自 YAML）。
         cache_file (str): 缓存文件路径。
+        max_workers (int): 同时处理的博客数量，抓取以网络等待为主，可适当调大。
+        session (requests.Session): 复用的请求会话，为空时自动创建。
 
     返回：
         (result_dict, error_friends_info_list)
@@ -28,28 +75,22 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
     # 1. 加载缓存
     cache_list = load_cache(cache_file)
 
-    # 2. 标记 YAML 条目
-    manual_list = []
+    # 2. 合并缓存与 YAML 条目（缓存先，YAML 后覆盖），同时记录手动源名称集合
+    rss_lookup = {e['name']: e for e in cache_list}
+    manual_name_set = set()
     for item in specific_RSS:
         if isinstance(item, dict) and 'name' in item and 'url' in item:
-            manual_list.append({'name': item['name'], 'url': item['url'], 'source': 'manual'})
-
-    # 3. 合并（缓存先，YAML 后覆盖）
-    combined_map = {e['name']: e for e in cache_list}
-    for e in manual_list:  # 手动优先
-        combined_map[e['name']] = e
-    specific_and_cache = list(combined_map.values())
-
-    # 4. 建立方便判断的集合：手动源名称集合
-    manual_name_set = {e['name'] for e in manual_list}
+            rss_lookup[item['name']] = {'name': item['name'], 'url': item['url'], 'source': 'manual'}
+            manual_name_set.add(item['name'])
 
-    # 5. 获取朋友列表
-    session = requests.Session()
+    # 3. 获取朋友列表
+    if session is None:
+        session = create_session()
     try:
         response = session.get(json_url, headers=HEADERS_JSON, timeout=timeout)
-        friends_data = response.json()
+        friends_data = orjson.loads(response.content)
     except Exception as e:
-        logging.error(f"无法获取链接：{json_url} ：{e}", exc_info=True)
+        logging.error("无法获取链接：%s ：%s", json_url, e, exc_info=True)
         return None
 
     friends = friends_data.get('friends', [])
@@ -59,12 +100,16 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
     total_articles = 0
     article_data = []
     error_friends_info = []
-    cache_updates = []  # 用于收集缓存更新（线程安全：用局部列表 + 合并）
-
-    # 6. 并发处理
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    cache_map = {e['name']: e for e in cache_list}  # 仅在主线程中更新，无需加锁
+    cache_update_count = 0
+
+    # 4. 并发处理
+    # 订阅探测使用独立的共享线程池：限制全局同时发出的探测请求数，
+    # 且不能与处理朋友的线程池共用，否则外层任务占满线程时内层探测会死锁
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as probe_executor, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_friend = {
-            executor.submit(process_friend, friend, session, count, specific_and_cache): friend
+            executor.submit(process_friend, friend, session, count, rss_lookup, probe_executor): friend
             for friend in friends
         }
 
@@ -73,10 +118,9 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
             try:
                 result = future.result()
 
-                # 拿回缓存更新意图
-                upd = result.get('cache_update', {})
-                if upd and upd.get('action') != 'none':
-                    cache_updates.append(upd)
+                # 拿回缓存更新意图并直接应用
+                if _apply_cache_update(cache_map, result.get('cache_update'), manual_name_set):
+                    cache_update_count += 1
 
                 if result['status'] == 'active':
                     active_friends += 1
@@ -87,47 +131,14 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
                     error_friends_info.append(friend)
 
             except Exception as e:
-                logging.error(f"处理 {friend} 时发生错误: {e}", exc_info=True)
+                logging.error("处理 %s 时发生错误: %s", friend, e, exc_info=True)
                 error_friends += 1
                 error_friends_info.append(friend)
 
-    # 7. 处理缓存更新
-    cache_map = {e['name']: e for e in cache_list}
-
-    # 去重 & 过滤无效条目
-    unique_updates = {}
-    for upd in cache_updates:
-        name = upd.get('name')
-        action = upd.get('action')
-        url = upd.get('url')
-        if not name:
-            continue
-
-        # 过滤手动 YAML 的条目（不允许覆盖）
-        if name in manual_name_set:
-            continue
-
-        # 只缓存有效 RSS 地址
-        if action == 'set':
-            if url and url != 'none' and url != '':
-                unique_updates[name] = {'action': 'set', 'url': url, 'reason': upd.get('reason', '')}
-        elif action == 'delete':
-            unique_updates[name] = {'action': 'delete', 'url': None, 'reason': upd.get('reason', '')}
-
-    # 应用缓存更新
-    for name, upd in unique_updates.items():
-        if upd['action'] == 'set':
-            cache_map[name] = {'name': name, 'url': upd['url'], 'source': 'cache'}
-            logging.info(f"缓存更新：SET {name} -> {upd['url']} ({upd['reason']})")
-        elif upd['action'] == 'delete':
-            if name in cache_map:
-                cache_map.pop(name)
-                logging.info(f"缓存更新：DELETE {name} ({upd['reason']})")
-
-    # 8. 保存缓存
+    # 5. 保存缓存
     save_cache(cache_file, list(cache_map.values()))
 
-    # 9. 汇总统计
+    # 6. 汇总统计
     result = {
         'statistical_data': {
             'friends_num': total_friends,
@@ -140,8 +151,9 @@ def fetch_and_process_data(json_url: str, specific_RSS: list = None, count: int
     }
 
     logging.info(
-        f"数据处理完成，总共有 {total_friends} 位朋友，其中 {active_friends} 位博客可访问，"
-        f"{error_friends} 位博客无法访问。缓存更新 {len(unique_updates)} 条。"
+        "数据处理完成，总共有 %s 位朋友，其中 %s 位博客可访问，"
+        "%s 位博客无法访问。缓存更新 %s 条。",
+        total_friends, active_friends, error_friends, cache_update_count,
     )
 
     return result, error_friends_info
@@ -156,48 +168,57 @@ def sort_articles_by_time(data):
     返回：
     dict: 按时间排序后的文章信息字典
     """
-    # 先确保每个元素存在时间
+    if 'article_data' not in data:
+        return data
+
+    # 先确保每个元素存在时间（合并来的第三方数据可能缺失该字段）
     for article in data['article_data']:
-        if article['created'] == '' or article['created'] == None:
+        if not article.get('created'):
             article['created'] = '2024-01-01 00:00'
             # 输出警告信息
-            logging.warning(f"文章 {article['title']} 未包含时间信息，已设置为默认时间 2024-01-01 00:00")
-    
-    if 'article_data' in data:
-        sorted_articles = sorted(
-            data['article_data'],
-            key=lambda x: datetime.strptime(x['created'], '%Y-%m-%d %H:%M'),
-            reverse=True
-        )
-        data['article_data'] = sorted_articles
+            logging.warning("文章 %s 未包含时间信息，已设置为默认时间 2024-01-01 00:00", article.get('title', ''))
+
+    # YYYY-MM-DD HH:MM 格式的字符串顺序即时间顺序，直接按字符串原地排序
+    data['article_data'].sort(key=lambda x: x['created'], reverse=True)
     return data
 
-def marge_data_from_json_url(data, marge_json_url):
+def marge_data_from_json_url(data, marge_json_url, session=None):
     """
     从另一个 JSON 文件中获取数据并合并到原数据中。
 
     参数：
     data (dict): 包含文章信息的字典
     marge_json_url (str): 包含另一个文章信息的 JSON 文件的 URL。
+    session (requests.Session): 复用的请求会话，为空时直接使用 requests。
 
     返回：
     dict: 合并后的文章信息字典，已去重处理
     """
     try:
-        response = requests.get(marge_json_url, headers=HEADERS_JSON, timeout=timeout)
-        marge_data = response.json()
+        response = (session or requests).get(marge_json_url, headers=HEADERS_JSON, timeout=timeout)
+        marge_data = orjson.loads(response.content)
     except Exception as e:
-        logging.error(f"无法获取链接：{marge_json_url}，出现的问题为：{e}", exc_info=True)
+        logging.error("无法获取链接：%s，出现的问题为：%s", marge_json_url, e, exc_info=True)
         return data
     
-    if 'article_data' in marge_data:
-        logging.info(f"开始合并数据，原数据共有 {len(data['article_data'])} 篇文章，第三方数据共有 {len(marge_data['article_data'])} 篇文章")
-        data['article_data'].extend(marge_data['article_data'])
-        data['article_data'] = list({v['link']:v for v in data['article_data']}.values())
-        logging.info(f"合并数据完成，现在共有 {len(data['article_data'])} 篇文章")
+    if not isinstance(marge_data, dict) or not marge_data.get('article_data'):
+        return data
+
+    logging.info("开始合并数据，原数据共有 %s 篇文章，第三方数据共有 %s 篇文章", len(data['article_data']), len(marge_data['article_data']))
+    # 按链接去重，保留首次出现的文章（本地数据优先）
+    seen = set()
+    merged = []
+    for article in itertools.chain(data['article_data'], marge_data['article_data']):
+        link = article['link']
+        if link in seen:
+            continue
+        seen.add(link)
+        merged.append(article)
+    data['article_data'] = merged
+    logging.info("合并数据完成，现在共有 %s 篇文章", len(data['article_data']))
     return data
 
-def marge_errors_from_json_url(errors, marge_json_url):
+def marge_errors_from_json_url(errors, marge_json_url, session=None):
     """
     从另一个网络 JSON 文件中获取错误信息并遍历，删除在errors中，
     不存在于marge_errors中的友链信息。
@@ -205,15 +226,16 @@ def marge_errors_from_json_url(errors, marge_json_url):
     参数：
     errors (list): 包含错误信息的列表
     marge_json_url (str): 包含另一个错误信息的 JSON 文件的 URL。
+    session (requests.Session): 复用的请求会话，为空时直接使用 requests。
 
     返回：
     list: 合并后的错误信息列表
     """
     try:
-        response = requests.get(marge_json_url, timeout=10)  # 设置请求超时时间
-        marge_errors = response.json()
+        response = (session or requests).get(marge_json_url, timeout=10)  # 设置请求超时时间
+        marge_errors = orjson.loads(response.content)
     except Exception as e:
-        logging.error(f"无法获取链接：{marge_json_url}，出现的问题为：{e}", exc_info=True)
+        logging.error("无法获取链接：%s，出现的问题为：%s", marge_json_url, e, exc_info=True)
         return errors
 
     # 提取 marge_errors 中的 URL
@@ -222,7 +244,7 @@ def marge_errors_from_json_url(errors, marge_json_url):
     # 使用过滤器保留 errors 中在 marge_errors 中出现的 URL
     filtered_errors = [error for error in errors if error[1] in marge_urls]
 
-    logging.info(f"合并错误信息完成，合并后共有 {len(filtered_errors)} 位朋友")
+    logging.info("合并错误信息完成，合并后共有 %s 位朋友", len(filtered_errors))
     return filtered_errors
 
 def deal_with_large_data(result):
@@ -255,6 +277,6 @@ def deal_with_large_data(result):
         result["article_data"] = filtered_articles
         # 更新结果中的统计数据
         result["statistical_data"]["article_num"] = len(filtered_articles)
-        logging.info(f"数据处理完成，保留 {len(filtered_articles)} 篇文章")
+        logging.info("数据处理完成，保留 %s 篇文章", len(filtered_articles))
 
     return result
\ No newline at end of file
@@ -1,15 +1,69 @@
 import logging
-from datetime import datetime
+import heapq
 import re
 import os
 import json
 import requests
-import feedparser
+import urllib3
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from friend_circle_lite import HEADERS_XML, timeout
+from friend_circle_lite.utils.feed import parse_feed_content
+from friend_circle_lite.utils.session import create_session
 from friend_circle_lite.utils.time import format_published_time
 from friend_circle_lite.utils.url import replace_non_domain
 
-def check_feed(blog_url, session):
+# 常见的订阅地址后缀，按探测优先级排列
+FEED_CANDIDATES = (
+    ('atom', '/atom.xml'),
+    ('rss', '/rss.xml'),  # 2024-07-26 添加 /rss.xml内容的支持
+    ('rss2', '/rss2.xml'),
+    ('rss3', '/rss.php'),  # 2024-12-07 添加 /rss.php内容的支持
+    ('feed', '/feed'),
+    ('feed2', '/feed.xml'),  # 2024-07-26 添加 /feed.xml内容的支持
+    ('feed3', '/feed/'),
+    ('feed4', '/feed.php'),  # 2025-07-22 添加 /feed.php内容的支持
+    ('index', '/index.xml'),  # 2024-07-25 添加 /index.xml内容的支持
+)
+
+# Content-Type 及内容开头中表明是订阅的特征
+FEED_CONTENT_TYPE_MARKERS = ('xml', 'rss', 'atom')
+FEED_BODY_MARKERS = (b'<rss', b'<feed', b'<rdf:rdf')
+
+# 增量解析时，至少连续遇到多少篇已见过的文章才允许停止解析
+STOP_AFTER_SEEN = 3
+
+def _probe_feed(feed_url, session):
+    """
+    探测单个候选地址是否为有效的 RSS / Atom 订阅。
+
+    返回：
+    bool: 状态码为 200 且 Content-Type 或内容开头符合订阅特征时返回 True。
+    """
+    try:
+        # stream=True：只下载判断所需的前 1KB，不拉取完整订阅内容
+        response = session.get(feed_url, headers=HEADERS_XML, timeout=timeout, stream=True)
+    except requests.RequestException:
+        return False
+
+    try:
+        if response.status_code == 200:
+            # 检查 Content-Type
+            content_type = response.headers.get('Content-Type', '').lower()
+            if any(marker in content_type for marker in FEED_CONTENT_TYPE_MARKERS):
+                return True
+            
+            # 如果 Content-Type 是 text/html 或未明确，但内容本身是 RSS（直接在字节上匹配，无需解码）
+            head = response.raw.read(1024, decode_content=True).lower()
+            if any(marker in head for marker in FEED_BODY_MARKERS):
+                return True
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError):
+        pass
+    finally:
+        response.close()
+    return False
+
+def check_feed(blog_url, session, executor=None):
     """
     检查博客的 RSS 或 Atom 订阅链接。
 
@@ -17,40 +71,76 @@ def check_feed(blog_url, session):
     - 检查 HTTP 状态码。
     - 检查 Content-Type 是否包含 xml / rss / atom。
     - 检查响应内容前几百字节内是否有 RSS/Atom 的特征标签。
+    - 各候选地址并发探测，最坏情况下只需等待一次超时。
+
+    参数：
+    blog_url (str): 博客地址。
+    session (requests.Session): 用于请求的会话对象。
+    executor (ThreadPoolExecutor): 共享的探测线程池，用于限制全局并发；为空时临时创建。
     """
-    possible_feeds = [
-        ('atom', '/atom.xml'),
-        ('rss', '/rss.xml'),  # 2024-07-26 添加 /rss.xml内容的支持
-        ('rss2', '/rss2.xml'),
-        ('rss3', '/rss.php'),  # 2024-12-07 添加 /rss.php内容的支持
-        ('feed', '/feed'),
-        ('feed2', '/feed.xml'),  # 2024-07-26 添加 /feed.xml内容的支持
-        ('feed3', '/feed/'),
-        ('feed4', '/feed.php'),  # 2025-07-22 添加 /feed.php内容的支持
-        ('index', '/index.xml')  # 2024-07-25 添加 /index.xml内容的支持
-    ]
+    base = blog_url.rstrip('/')
+    candidates = [(feed_type, base + path) for feed_type, path in FEED_CANDIDATES]
 
-    for feed_type, path in possible_feeds:
-        feed_url = blog_url.rstrip('/') + path
-        try:
-            response = session.get(feed_url, headers=HEADERS_XML, timeout=timeout)
-            if response.status_code == 200:
-                # 检查 Content-Type
-                content_type = response.headers.get('Content-Type', '').lower()
-                if 'xml' in content_type or 'rss' in content_type or 'atom' in content_type:
-                    return [feed_type, feed_url]
-                
-                # 如果 Content-Type 是 text/html 或未明确，但内容本身是 RSS
-                text_head = response.text[:1000].lower()  # 读取前1000字符
-                if ('<rss' in text_head or '<feed' in text_head or '<rdf:rdf' in text_head):
-                    return [feed_type, feed_url]
-        except requests.RequestException:
-            continue
-
-    logging.warning(f"无法找到 {blog_url} 的订阅链接")
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+
+    # 所有候选地址并发探测，但按 FEED_CANDIDATES 的优先级取结果，
+    # 保证与逐个探测时选中的订阅地址一致
+    futures = [executor.submit(_probe_feed, feed_url, session) for _, feed_url in candidates]
+    try:
+        for (feed_type, feed_url), future in zip(candidates, futures):
+            if future.result():
+                return [feed_type, feed_url]
+    finally:
+        # 已找到结果时取消尚未开始的探测，不再等待其余探测
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    logging.warning("无法找到 %s 的订阅链接", blog_url)
     return ['none', blog_url]
 
-def parse_feed(url, session, count=5, blog_url=''):
+def _make_stop_when(seen_articles, count, blog_url):
+    """
+    根据上次解析出的文章构造增量解析的停止条件，供 parse_feed_content 使用。
+
+    只有确认订阅按时间倒序排列时才停止：已解析文章的时间单调不增、至少解析了 count 篇、
+    连续遇到 STOP_AFTER_SEEN 篇（或全部）已见过的文章，且当前文章不晚于上次最旧的一篇。
+    此时其后的文章都更旧，不会进入最新的 count 篇；顺序不满足时（如按时间正序、有置顶文章）解析全部内容。
+
+    返回：
+    callable | None: 以每篇文章调用，返回 True 表示可以停止；没有上次的文章时返回 None。
+    """
+    if not seen_articles:
+        return None
+
+    # 缓存中的链接已经过 replace_non_domain 处理，比较前对新解析的链接做同样处理
+    seen_links = {a['link'] for a in seen_articles}
+    oldest_seen = min(a['published'] for a in seen_articles)
+    stop_after = min(STOP_AFTER_SEEN, len(seen_links))
+    state = {'parsed': 0, 'seen_run': 0, 'last': None, 'ordered': bool(oldest_seen)}
+
+    def stop_when(entry):
+        raw_time = entry['published'] or entry['updated']
+        published = format_published_time(raw_time) if raw_time else ''
+        state['parsed'] += 1
+        if not published or (state['last'] is not None and published > state['last']):
+            state['ordered'] = False
+        state['last'] = published
+        if not state['ordered']:
+            return False
+
+        link = replace_non_domain(entry['link'], blog_url) if entry['link'] else ''
+        state['seen_run'] = state['seen_run'] + 1 if link in seen_links else 0
+        return (state['seen_run'] >= stop_after
+                and state['parsed'] >= count
+                and published <= oldest_seen)
+
+    return stop_when
+
+def parse_feed(url, session, count=5, blog_url='', etag=None, last_modified=None, seen_articles=None):
     """
     解析 Atom 或 RSS2 feed 并返回包含网站名称、作者、原链接和每篇文章详细内容的字典。
 
@@ -61,63 +151,133 @@ def parse_feed(url, session, count=5, blog_url=''):
     url (str): Atom 或 RSS2 feed 的 URL。
     session (requests.Session): 用于请求的会话对象。
     count (int): 获取文章数的最大数。如果小于则全部获取，如果文章数大于则只取前 count 篇文章。
+    etag (str): 上次请求返回的 ETag，用于条件请求（If-None-Match）。
+    last_modified (str): 上次请求返回的 Last-Modified，用于条件请求（If-Modified-Since）。
+    seen_articles (list[dict]): 上次解析出的文章 [{title, published, link}]。给出且订阅按时间倒序排列时，
+                                解析到上次的旧文章即停止，见 _make_stop_when。
 
     返回：
-    dict: 包含网站名称、作者、原链接和每篇文章详细内容的字典。
+    dict: 包含网站名称、作者、原链接和每篇文章详细内容的字典，以及本次响应的 etag / last_modified。
+          若服务器返回 304，则 not_modified 为 True 且 articles 为空，调用方应复用上次的文章。
     """
     try:
-        response = session.get(url, headers=HEADERS_XML, timeout=timeout)
-        response.encoding = response.apparent_encoding or 'utf-8'
-        feed = feedparser.parse(response.text)
-        
+        headers = HEADERS_XML
+        if etag or last_modified:
+            headers = dict(HEADERS_XML)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        # 响应体整体读入内存后以原始字节交给解析器，由 XML 声明和响应头判断编码，
+        # 省去 apparent_encoding 的全文编码探测和 response.text 的整份 unicode 拷贝
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return {
+                'website_name': '',
+                'author': '',
+                'link': '',
+                'articles': [],
+                'etag': etag,
+                'last_modified': last_modified,
+                'not_modified': True,
+            }
+
+        feed = parse_feed_content(
+            response.content,
+            response_headers={k.lower(): v for k, v in response.headers.items()},
+            stop_when=_make_stop_when(seen_articles, count, blog_url),
+            base_url=response.url,
+        )
+
         result = {
-            'website_name': feed.feed.title if 'title' in feed.feed else '', # type: ignore
-            'author': feed.feed.author if 'author' in feed.feed else '', # type: ignore
-            'link': feed.feed.link if 'link' in feed.feed else '', # type: ignore
-            'articles': []
+            'website_name': feed['title'],
+            'author': feed['author'],
+            'link': feed['link'],
+            'articles': [],
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'not_modified': False,
         }
         
-        for _ , entry in enumerate(feed.entries):
+        # 先只计算每篇文章的时间，选出最新的 count 篇后再构建文章字典
+        timed_entries = []
+        for entry in feed['entries']:
             
-            if 'published' in entry:
-                published = format_published_time(entry.published)
-            elif 'updated' in entry:
-                published = format_published_time(entry.updated)
+            if entry['published']:
+                published = format_published_time(entry['published'])
+            elif entry['updated']:
+                published = format_published_time(entry['updated'])
                 # 输出警告信息
-                logging.warning(f"文章 {entry.title} 未包含发布时间，已使用更新时间 {published}")
+                logging.warning("文章 %s 未包含发布时间，已使用更新时间 %s", entry['title'], published)
             else:
                 published = ''
-                logging.warning(f"文章 {entry.title} 未包含任何时间信息, 请检查原文, 设置为默认时间")
-            
+                logging.warning("文章 %s 未包含任何时间信息, 请检查原文, 设置为默认时间", entry['title'])
+            timed_entries.append((published, entry))
+
+        # YYYY-MM-DD HH:MM 格式的字符串顺序即时间顺序，无时间（空字符串）的文章自然排在最后
+        for published, entry in heapq.nlargest(count, timed_entries, key=itemgetter(0)):
             # 处理链接中可能存在的错误，比如ip或localhost
-            article_link = replace_non_domain(entry.link, blog_url) if 'link' in entry else '' # type: ignore
+            article_link = replace_non_domain(entry['link'], blog_url) if entry['link'] else ''
             
             article = {
-                'title': entry.title if 'title' in entry else '',
+                'title': entry['title'],
                 'author': result['author'],
                 'link': article_link,
                 'published': published,
-                'summary': entry.summary if 'summary' in entry else '',
-                'content': entry.content[0].value if 'content' in entry and entry.content else entry.description if 'description' in entry else ''
+                'summary': entry['summary'],
+                'content': entry['content'],
             }
             result['articles'].append(article)
         
-        # 对文章按时间排序，并只取前 count 篇文章
-        result['articles'] = sorted(result['articles'], key=lambda x: datetime.strptime(x['published'], '%Y-%m-%d %H:%M'), reverse=True)
-        if count < len(result['articles']):
-            result['articles'] = result['articles'][:count]
-        
         return result
     except Exception as e:
-        logging.error(f"无法解析FEED地址：{url} ，请自行排查原因！错误信息: {str(e)}")
+        logging.error("无法解析FEED地址：%s ，请自行排查原因！错误信息: %s", url, e)
         return {
             'website_name': '',
             'author': '',
             'link': '',
-            'articles': []
+            'articles': [],
+            'etag': None,
+            'last_modified': None,
+            'not_modified': False,
         }
 
-def process_friend(friend, session: requests.Session, count: int, specific_and_cache=None):
+def _feed_state(feed_info):
+    """
+    提取需要写入缓存的订阅状态，用于下次运行时发送条件请求及增量解析。
+    """
+    return {
+        'etag': feed_info.get('etag'),
+        'last_modified': feed_info.get('last_modified'),
+        'articles': [
+            {'title': a['title'], 'published': a['published'], 'link': a['link']}
+            for a in feed_info['articles']
+        ],
+    }
+
+def _articles_from_feed_info(feed_info, name, avatar):
+    """
+    将 parse_feed 解析出的文章转换为输出格式（all.json 中的 article_data 条目），并记录日志。
+    """
+    articles = [
+        {
+            'title': a['title'],
+            'created': a['published'],
+            'link': a['link'],
+            'author': name,
+            'avatar': avatar,
+        }
+        for a in feed_info['articles']
+    ]
+
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        for a in articles:
+            logging.info("%s 发布了新文章：%s，时间：%s，链接：%s", name, a['title'], a['created'], a['link'])
+
+    return articles
+
+def process_friend(friend, session: requests.Session, count: int, rss_lookup=None, probe_executor=None):
     """
     处理单个朋友的博客信息。
     
@@ -125,7 +285,8 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
         friend (list/tuple): [name, blog_url, avatar]
         session (requests.Session): 请求会话
         count (int): 每个博客最大文章数
-        specific_and_cache (list[dict]): [{name, url, source?}]，合并后的特殊 + 缓存列表
+        rss_lookup (dict[str, dict]): {name: {name, url, source?, etag?, last_modified?, articles?}}，合并后的特殊 + 缓存源
+        probe_executor (ThreadPoolExecutor): 共享的订阅探测线程池，传给 check_feed
     
     返回：
         {
@@ -138,19 +299,20 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
                 'action': 'set' | 'delete' | 'none',
                 'name': name,
                 'url': feed_url_or_None,
-                'reason': 'auto_discovered' | 'repair_cache' | 'remove_invalid',
+                'reason': 'auto_discovered' | 'repair_cache' | 'refresh' | 'remove_invalid',
+                'etag'?, 'last_modified'?, 'articles'?: 条件请求所需的订阅状态
             },
             'source_used': 'manual' | 'cache' | 'auto' | 'none'
         }
     """
-    if specific_and_cache is None:
-        specific_and_cache = []
+    if rss_lookup is None:
+        rss_lookup = {}
 
     # 解包 friend
     try:
         name, blog_url, avatar = friend
     except Exception:
-        logging.error(f"friend 数据格式不正确: {friend!r}")
+        logging.error("friend 数据格式不正确: %r", friend)
         return {
             'name': None,
             'status': 'error',
@@ -161,7 +323,6 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
             'source_used': 'none',
         }
 
-    rss_lookup = {e['name']: e for e in specific_and_cache if 'name' in e and 'url' in e}
     cache_update = {'action': 'none', 'name': name, 'url': None, 'reason': ''}
     feed_url, feed_type, source_used = None, 'none', 'none'
 
@@ -171,12 +332,12 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
         feed_url = entry['url']
         feed_type = 'specific'
         source_used = entry.get('source', 'unknown')
-        logging.info(f"“{name}” 使用预设 RSS 源：{feed_url} （source={source_used}）。")
+        logging.info("“%s” 使用预设 RSS 源：%s （source=%s）。", name, feed_url, source_used)
     else:
         # ---- 2. 自动探测 ----
-        feed_type, feed_url = check_feed(blog_url, session)
+        feed_type, feed_url = check_feed(blog_url, session, probe_executor)
         source_used = 'auto'
-        logging.info(f"“{name}” 自动探测 RSS：type：{feed_type}, url：{feed_url} 。")
+        logging.info("“%s” 自动探测 RSS：type：%s, url：%s 。", name, feed_type, feed_url)
 
         if feed_type != 'none' and feed_url:
             cache_update = {'action': 'set', 'name': name, 'url': feed_url, 'reason': 'auto_discovered'}
@@ -185,54 +346,58 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
     articles, parse_error = [], False
     if feed_type != 'none' and feed_url:
         try:
-            feed_info = parse_feed(feed_url, session, count, blog_url)
+            # 缓存中有上次的文章时发送条件请求（304 时直接复用），并只增量解析新文章
+            cached_state = {}
+            if source_used == 'cache' and entry.get('articles'):
+                cached_state = {
+                    'etag': entry.get('etag'),
+                    'last_modified': entry.get('last_modified'),
+                    'seen_articles': entry['articles'],
+                }
+
+            feed_info = parse_feed(feed_url, session, count, blog_url, **cached_state)
             if isinstance(feed_info, dict) and 'articles' in feed_info:
-                articles = [
-                    {
-                        'title': a['title'],
-                        'created': a['published'],
-                        'link': a['link'],
-                        'author': name,
-                        'avatar': avatar,
-                    }
-                    for a in feed_info['articles']
-                ]
+                if feed_info.get('not_modified'):
+                    logging.info("“%s” 的 RSS 未更新（304），复用缓存文章。", name)
+                    feed_info['articles'] = entry['articles']
 
-                for a in articles:
-                    logging.info(f"{name} 发布了新文章：{a['title']}，时间：{a['created']}，链接：{a['link']}")
+                articles = _articles_from_feed_info(feed_info, name, avatar)
+
+                if source_used in ('cache', 'auto') and articles:
+                    cache_update = {
+                        'action': 'set',
+                        'name': name,
+                        'url': feed_url,
+                        'reason': cache_update['reason'] or 'refresh',
+                        **_feed_state(feed_info),
+                    }
             else:
                 parse_error = True
         except Exception as e:
-            logging.warning(f"解析 RSS 失败（{name} -> {feed_url}）：{e}")
+            logging.warning("解析 RSS 失败（%s -> %s）：%s", name, feed_url, e)
             parse_error = True
 
     # ---- 4. 如果缓存 RSS 无效则重新探测 ----
     if parse_error and source_used in ('cache', 'unknown'):
-        logging.info(f"缓存 RSS 无效，重新探测：{name} ({blog_url})。")
-        new_type, new_url = check_feed(blog_url, session)
+        logging.info("缓存 RSS 无效，重新探测：%s (%s)。", name, blog_url)
+        new_type, new_url = check_feed(blog_url, session, probe_executor)
         if new_type != 'none' and new_url:
             try:
                 feed_info = parse_feed(new_url, session, count, blog_url)
                 if isinstance(feed_info, dict) and 'articles' in feed_info:
-                    articles = [
-                        {
-                            'title': a['title'],
-                            'created': a['published'],
-                            'link': a['link'],
-                            'author': name,
-                            'avatar': avatar,
-                        }
-                        for a in feed_info['articles']
-                    ]
-
-                    for a in articles:
-                        logging.info(f"{name} 发布了新文章：{a['title']}，时间：{a['created']}，链接：{a['link']}")
+                    articles = _articles_from_feed_info(feed_info, name, avatar)
 
                     feed_type, feed_url, source_used = new_type, new_url, 'auto'
-                    cache_update = {'action': 'set', 'name': name, 'url': new_url, 'reason': 'repair_cache'}
+                    cache_update = {
+                        'action': 'set',
+                        'name': name,
+                        'url': new_url,
+                        'reason': 'repair_cache',
+                        **_feed_state(feed_info),
+                    }
                     parse_error = False
             except Exception as e:
-                logging.warning(f"重新探测解析仍失败：{name} ({new_url})：{e}")
+                logging.warning("重新探测解析仍失败：%s (%s)：%s", name, new_url, e)
                 cache_update = {'action': 'delete', 'name': name, 'url': None, 'reason': 'remove_invalid'}
                 feed_type, feed_url = 'none', None
         else:
@@ -243,9 +408,9 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
     status = 'active' if articles else 'error'
     if not articles:
         if feed_type == 'none':
-            logging.warning(f"{name} 的博客 {blog_url} 未找到有效 RSS。")
+            logging.warning("%s 的博客 %s 未找到有效 RSS。", name, blog_url)
         else:
-            logging.warning(f"{name} 的 RSS {feed_url} 未解析出文章。")
+            logging.warning("%s 的 RSS %s 未解析出文章。", name, feed_url)
 
     return {
         'name': name,
@@ -257,13 +422,14 @@ def process_friend(friend, session: requests.Session, count: int, specific_and_c
         'source_used': source_used,
     }
 
-def get_latest_articles_from_link(url, count=5, last_articles_path="./temp/newest_posts.json"):
+def get_latest_articles_from_link(url, count=5, last_articles_path="./temp/newest_posts.json", session=None):
     """
     从指定链接获取最新的文章数据并与本地存储的上次的文章数据进行对比。
 
     参数：
     url (str): 用于获取文章数据的链接。
     count (int): 获取文章数的最大数。如果小于则全部获取，如果文章数大于则只取前 count 篇文章。
+    session (requests.Session): 复用的请求会话，为空时自动创建。
 
     返回：
     list: 更新的文章列表，如果没有更新的文章则返回 None。
@@ -272,10 +438,11 @@ def get_latest_articles_from_link(url, count=5, last_articles_path="./temp/newes
     local_file = last_articles_path
     
     # 检查和解析 feed
-    session = requests.Session()
+    if session is None:
+        session = create_session()
     feed_type, feed_url = check_feed(url, session)
     if feed_type == 'none':
-        logging.error(f"无法获取 {url} 的文章数据")
+        logging.error("无法获取 %s 的文章数据", url)
         return None
 
     # 获取最新的文章数据
@@ -299,7 +466,7 @@ def get_latest_articles_from_link(url, count=5, last_articles_path="./temp/newes
         if article['link'] not in last_titles:
             updated_articles.append(article)
     
-    logging.info(f"从 {url} 获取到 {len(latest_articles)} 篇文章，其中 {len(updated_articles)} 篇为新文章")
+    logging.info("从 %s 获取到 %s 篇文章，其中 %s 篇为新文章", url, len(latest_articles), len(updated_articles))
 
     # 更新本地存储的文章数据
     with open(local_file, 'w', encoding='utf-8') as file:
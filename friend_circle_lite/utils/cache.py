@@ -1,17 +1,19 @@
 import logging
 from friend_circle_lite.utils.json import read_json, write_json
 
+CACHE_STATE_KEYS = ('etag', 'last_modified', 'articles')
+
 def load_cache(cache_file: str):
     if not cache_file:
         return []
     
     data = read_json(cache_file)
     if data is None:
-        logging.info(f"缓存文件 {cache_file} 不存在或无法读取，将自动创建。")
+        logging.info("缓存文件 %s 不存在或无法读取，将自动创建。", cache_file)
         return []
 
     if not isinstance(data, list):
-        logging.warning(f"缓存文件 {cache_file} 格式异常（应为列表）。将忽略。")
+        logging.warning("缓存文件 %s 格式异常（应为列表）。将忽略。", cache_file)
         return []
 
     norm = []
@@ -21,15 +23,26 @@ def load_cache(cache_file: str):
         name = item.get('name')
         url = item.get('url')
         if name and url:
-            norm.append({'name': name, 'url': url, 'source': 'cache'})
+            entry = {'name': name, 'url': url, 'source': 'cache'}
+            # 条件请求状态（可选）：ETag / Last-Modified 及上次解析出的文章
+            for key in CACHE_STATE_KEYS:
+                if item.get(key):
+                    entry[key] = item[key]
+            norm.append(entry)
     return norm
 
 def save_cache(cache_file: str, cache_items: list[dict]):
     if not cache_file:
         return
 
-    out = [{'name': i['name'], 'url': i['url']} for i in cache_items]
+    out = []
+    for i in cache_items:
+        item = {'name': i['name'], 'url': i['url']}
+        for key in CACHE_STATE_KEYS:
+            if i.get(key):
+                item[key] = i[key]
+        out.append(item)
     if write_json(cache_file, out):
-        logging.info(f"缓存已保存到 {cache_file}（{len(out)} 条）。")
+        logging.info("缓存已保存到 %s（%s 条）。", cache_file, len(out))
     else:
-        logging.error(f"保存缓存文件 {cache_file} 失败")
+        logging.error("保存缓存文件 %s 失败", cache_file)
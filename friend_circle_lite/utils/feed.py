@@ -0,0 +1,213 @@
+import logging
+import feedparser
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from urllib.parse import urljoin
+# feedparser 未公开的清理函数，依赖 requirements.txt 中固定的 feedparser==6.0.11，升级时需确认仍然可用
+from feedparser.sanitizer import _sanitize_html
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+XHTML_NS = '{http://www.w3.org/1999/xhtml}'
+XML_BASE = '{http://www.w3.org/XML/1998/namespace}base'
+
+def _text(elem, path):
+    """读取子元素文本并去除首尾空白，不存在时返回空字符串。"""
+    value = elem.findtext(path)
+    return value.strip() if value else ''
+
+def _resolve(base, href):
+    """按 xml:base 解析相对链接，与 feedparser 的行为一致。"""
+    href = href.strip()
+    return urljoin(base, href) if base and href else href
+
+def _sanitize(html):
+    """
+    清理 HTML 中的 script、事件属性等危险内容（摘要会被写入推送邮件）。
+
+    使用 feedparser 自带的清理器，与回退路径的结果保持一致；纯文本直接返回。
+    """
+    if '<' not in html:
+        return html
+    return _sanitize_html(html, 'utf-8', 'text/html')
+
+def _atom_link(elem, base):
+    """取 Atom 中 rel 为 alternate（或缺省）的第一个链接。"""
+    for link in elem.findall(ATOM_NS + 'link'):
+        if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+            link_base = _resolve(base, link.get(XML_BASE, '')) or base
+            return _resolve(link_base, link.get('href'))
+    return ''
+
+def _xhtml(elem):
+    """序列化 type="xhtml" 的内容：去掉 XHTML 命名空间前缀及外层 div，与 feedparser 一致。"""
+    for child in elem.iter():
+        if child.tag.startswith(XHTML_NS):
+            child.tag = child.tag[len(XHTML_NS):]
+    if len(elem) == 1 and elem[0].tag == 'div' and not (elem.text or '').strip() and not (elem[0].tail or '').strip():
+        elem = elem[0]
+    return ((elem.text or '') + ''.join(ET.tostring(child, encoding='unicode') for child in elem)).strip()
+
+def _atom_text(elem, tag):
+    """读取 Atom summary / content，type="xhtml" 时内容为子元素，需要序列化。"""
+    node = elem.find(ATOM_NS + tag)
+    if node is None:
+        return ''
+    if node.get('type') == 'xhtml' or len(node):
+        return _xhtml(node)
+    return (node.text or '').strip()
+
+def _rss_item(item, base):
+    link = _text(item, 'link')
+    if not link:
+        guid = item.find('guid')
+        if guid is not None and guid.get('isPermaLink', 'true') != 'false':
+            link = (guid.text or '').strip()
+    description = _text(item, 'description')
+    content = _text(item, CONTENT_NS + 'encoded') or description
+    return {
+        'title': _text(item, 'title'),
+        'link': _resolve(base, link),
+        'published': _text(item, 'pubDate'),
+        'updated': _text(item, DC_NS + 'date') or _text(item, ATOM_NS + 'updated'),
+        # 与 feedparser 一致，没有摘要时以正文代替
+        'summary': _sanitize(description or content),
+        'content': content,
+    }
+
+def _atom_entry(entry, base):
+    content = _atom_text(entry, 'content')
+    return {
+        'title': _text(entry, ATOM_NS + 'title'),
+        'link': _atom_link(entry, base),
+        'published': _text(entry, ATOM_NS + 'published') or _text(entry, ATOM_NS + 'issued'),
+        'updated': _text(entry, ATOM_NS + 'updated') or _text(entry, ATOM_NS + 'modified'),
+        'summary': _sanitize(_atom_text(entry, 'summary') or content),
+        'content': content,
+    }
+
+def _parse_xml_fast(data, stop_when=None, base_url=''):
+    """
+    使用 ElementTree.iterparse 逐元素解析内存中的 RSS 2.0 / Atom 字节。
+
+    每解析完一篇文章立即提取所需字段并从树中移除，避免构建完整的文档树。
+    链接按 xml:base（逐层继承，最外层为 base_url）解析为绝对地址；摘要会写入推送邮件，经过 HTML 清理。
+    若给出 stop_when，每解析出一篇文章即以该文章调用一次，返回 True 时停止解析。
+
+    返回：
+    dict | None: 与 parse_feed_content 相同的结构；根节点不是 rss / feed 时返回 None。
+    """
+    feed = {'title': '', 'author': '', 'link': '', 'entries': []}
+    stack = []
+    bases = []  # 与 stack 对应的 xml:base
+    kind = None
+
+    for event, elem in ET.iterparse(BytesIO(data), events=('start', 'end')):
+        if event == 'start':
+            if kind is None:
+                if elem.tag == 'rss':
+                    kind = 'rss'
+                elif elem.tag == ATOM_NS + 'feed':
+                    kind = 'atom'
+                else:
+                    return None
+            parent_base = bases[-1] if bases else base_url
+            stack.append(elem)
+            bases.append(_resolve(parent_base, elem.get(XML_BASE, '')) or parent_base)
+            continue
+
+        stack.pop()
+        base = bases.pop()
+        parent = stack[-1] if stack else None
+        entry = None
+
+        if kind == 'rss':
+            if elem.tag == 'item':
+                entry = _rss_item(elem, base)
+                parent.remove(elem)
+            elif len(stack) == 2 and stack[1].tag == 'channel':
+                # channel 下的站点信息
+                if elem.tag == 'title' and not feed['title']:
+                    feed['title'] = (elem.text or '').strip()
+                elif elem.tag == 'link' and not feed['link']:
+                    feed['link'] = _resolve(base, elem.text or '')
+                elif elem.tag in ('managingEditor', DC_NS + 'creator', 'author') and not feed['author']:
+                    feed['author'] = (elem.text or '').strip()
+        else:
+            if elem.tag == ATOM_NS + 'entry':
+                entry = _atom_entry(elem, base)
+                parent.remove(elem)
+            elif len(stack) == 1:
+                # feed 下的站点信息
+                if elem.tag == ATOM_NS + 'title' and not feed['title']:
+                    feed['title'] = (elem.text or '').strip()
+                elif elem.tag == ATOM_NS + 'author' and not feed['author']:
+                    feed['author'] = _text(elem, ATOM_NS + 'name')
+                elif elem.tag == ATOM_NS + 'link' and not feed['link'] and elem.get('rel', 'alternate') == 'alternate':
+                    feed['link'] = _resolve(base, elem.get('href') or '')
+
+        if entry is None:
+            continue
+
+        feed['entries'].append(entry)
+        if stop_when and stop_when(entry):
+            break
+
+    return feed
+
+def _parse_with_feedparser(data, response_headers, base_url=''):
+    """使用 feedparser 解析（兼容 RSS 1.0、非标准或格式有误的订阅），并转换为统一结构。"""
+    if base_url and 'content-location' not in response_headers:
+        # feedparser 以 Content-Location 作为解析相对链接的基准地址
+        response_headers = {**response_headers, 'content-location': base_url}
+    parsed = feedparser.parse(data, response_headers=response_headers)
+    feed = {
+        'title': parsed.feed.get('title', ''),
+        'author': parsed.feed.get('author', ''),
+        'link': parsed.feed.get('link', ''),
+        'entries': [],
+    }
+    for entry in parsed.entries:
+        feed['entries'].append({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'published': entry.get('published', ''),
+            'updated': entry.get('updated', ''),
+            'summary': entry.get('summary', ''),
+            'content': entry.content[0].value if 'content' in entry and entry.content else entry.get('description', ''),
+        })
+    return feed
+
+def parse_feed_content(data: bytes, response_headers: dict | None = None, stop_when=None, base_url: str = '') -> dict:
+    """
+    解析订阅内容，优先使用 iterparse 逐元素解析，无法识别时回退到 feedparser。
+
+    参数：
+    data (bytes): 订阅原始内容。
+    response_headers (dict): 响应头（小写键），用于判断编码。
+    stop_when (callable): 以每篇解析出的文章调用，返回 True 时提前结束解析；仅 iterparse 解析时生效，
+                          回退到 feedparser 时总是解析全部文章。
+    base_url (str): 订阅地址，用于解析相对链接。
+
+    返回：
+    dict: {
+        'title', 'author', 'link',
+        'entries': [{'title', 'link', 'published', 'updated', 'summary', 'content'}]
+    }
+    其中时间字段为原始字符串，未做格式化。
+    """
+    response_headers = response_headers or {}
+    content_type = response_headers.get('content-type', '').lower()
+    charset = content_type.partition('charset=')[2].strip(' "\'')
+
+    # 响应头声明了非 UTF-8 编码时，XML 声明可能缺失，交给 feedparser 处理
+    if not charset or charset in ('utf-8', 'utf8', 'us-ascii'):
+        try:
+            feed = _parse_xml_fast(data, stop_when, base_url)
+            if feed is not None:
+                return feed
+        except (ET.ParseError, ValueError) as e:
+            logging.debug("iterparse 解析失败，回退到 feedparser：%s", e)
+
+    return _parse_with_feedparser(data, response_headers, base_url)
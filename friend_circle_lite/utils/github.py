@@ -3,12 +3,13 @@ import requests
 import re
 from friend_circle_lite import HEADERS_JSON
 
-def extract_emails_from_issues(api_url):
+def extract_emails_from_issues(api_url, session=None):
     """
     从GitHub issues API中提取以[e-mail]开头的title中的邮箱地址。
 
     参数：
     api_url (str): GitHub issues API的URL。
+    session (requests.Session): 复用的请求会话，为空时直接使用 requests。
 
     返回：
     dict: 包含所有提取的邮箱地址的字典。
@@ -19,7 +20,7 @@ def extract_emails_from_issues(api_url):
     }
     """
     try:
-        response = requests.get(api_url, headers=HEADERS_JSON, timeout=10)
+        response = (session or requests).get(api_url, headers=HEADERS_JSON, timeout=10)
         response.raise_for_status()
         issues = response.json()
     except Exception as e:
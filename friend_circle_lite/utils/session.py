@@ -0,0 +1,34 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_session(pool_size: int = 64) -> requests.Session:
+    """
+    创建全局复用的请求会话。
+
+    - 连接池大小与并发数匹配，避免多线程下连接被频繁丢弃重建（保持 keep-alive）。
+    - 仅对 5xx 状态码做少量重试；连接/读取超时不重试，避免死站拖慢整体耗时。
+    - 忽略 Retry-After：维护中的站点可能要求等待数小时，重试间隔只按 backoff_factor 计算。
+
+    参数：
+    pool_size (int): 每个主机的连接池大小及缓存的主机连接池数量。
+
+    返回：
+    requests.Session: 已挂载连接池适配器的会话对象。
+    """
+    retry = Retry(
+        total=2,
+        connect=0,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -1,42 +1,66 @@
 import logging
+from functools import lru_cache
 from dateutil import parser
 from datetime import datetime, timezone, timedelta
 
+# 常见的 RSS / Atom 时间格式，按出现频率排列
+RFC822_FORMATS = (
+    '%a, %d %b %Y %H:%M:%S %z',    # Mon, 11 Mar 2024 14:08:32 +0000
+    '%a, %d %b %Y %H:%M:%S GMT',   # Wed, 19 Jun 2024 09:43:53 GMT
+)
+
+ISO8601_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%f%z',      # 2024-03-11T14:08:32.000Z
+    '%Y-%m-%dT%H:%M:%S%z',         # 2024-03-11T14:08:32+00:00
+    '%Y-%m-%dT%H:%M:%SZ',          # 2024-03-11T14:08:32Z
+    '%Y-%m-%d %H:%M:%S',           # 2024-03-11 14:08:32
+    '%Y-%m-%d',                    # 2024-03-11
+)
+
+SHANGHAI_TZ = timezone(timedelta(hours=8))
+
+def _strptime_known_formats(time_str):
+    """
+    按已知格式依次尝试 strptime，根据首字符只尝试对应的一组格式。
+
+    返回:
+    datetime | None: 解析成功返回 datetime，否则返回 None。
+    """
+    formats = ISO8601_FORMATS if time_str[:1].isdigit() else RFC822_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+@lru_cache(maxsize=4096)
 def format_published_time(time_str):
     """
     格式化发布时间为统一格式 YYYY-MM-DD HH:MM
 
+    优先使用 strptime 匹配已知格式，失败后才交给 dateutil 模糊解析。
+    结果会被缓存，同一时间字符串在多篇文章或多次刷新间重复出现时无需再次解析。
+
     参数:
     time_str (str): 输入的时间字符串，可能是多种格式。
 
     返回:
     str: 格式化后的时间字符串，若解析失败返回空字符串。
     """
-    # 尝试自动解析输入时间字符串
-    try:
-        parsed_time = parser.parse(time_str, fuzzy=True)
-    except (ValueError, parser.ParserError):
-        # 定义支持的时间格式
-        time_formats = [
-            '%a, %d %b %Y %H:%M:%S %z',  # Mon, 11 Mar 2024 14:08:32 +0000
-            '%a, %d %b %Y %H:%M:%S GMT',   # Wed, 19 Jun 2024 09:43:53 GMT
-            '%Y-%m-%dT%H:%M:%S%z',         # 2024-03-11T14:08:32+00:00
-            '%Y-%m-%dT%H:%M:%SZ',          # 2024-03-11T14:08:32Z
-            '%Y-%m-%d %H:%M:%S',           # 2024-03-11 14:08:32
-            '%Y-%m-%d'                     # 2024-03-11
-        ]
-        for fmt in time_formats:
-            try:
-                parsed_time = datetime.strptime(time_str, fmt)
-                break
-            except ValueError:
-                continue
-        else:
-            logging.warning(f"无法解析时间字符串：{time_str}")
+    time_str = time_str.strip()
+    parsed_time = _strptime_known_formats(time_str)
+
+    if parsed_time is None:
+        # 兜底：自动解析输入时间字符串
+        try:
+            parsed_time = parser.parse(time_str, fuzzy=True)
+        except (ValueError, OverflowError, parser.ParserError):
+            logging.warning("无法解析时间字符串：%s", time_str)
             return ''
 
     # 处理时区转换
     if parsed_time.tzinfo is None:
         parsed_time = parsed_time.replace(tzinfo=timezone.utc)
-    shanghai_time = parsed_time.astimezone(timezone(timedelta(hours=8)))
-    return shanghai_time.strftime('%Y-%m-%d %H:%M')
\ No newline at end of file
+    shanghai_time = parsed_time.astimezone(SHANGHAI_TZ)
+    return shanghai_time.strftime('%Y-%m-%d %H:%M')
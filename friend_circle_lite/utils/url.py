@@ -2,6 +2,9 @@ import logging
 from urllib.parse import urlparse, urljoin
 import re
 
+_IPV4_RE = re.compile(r'^\d{1,3}(\.\d{1,3}){3}$')
+_LOCAL_HOSTS = frozenset({'localhost', '127.0.0.1', '0.0.0.0', '::1'})
+
 def replace_non_domain(link: str, blog_url: str) -> str:
     """
     暂未实现
@@ -14,7 +17,8 @@ def replace_non_domain(link: str, blog_url: str) -> str:
     """
     try:
         parsed = urlparse(link)
-        if 'localhost' in parsed.netloc or re.match(r'^\d{1,3}(\.\d{1,3}){3}$', parsed.netloc):  # IP地址或localhost
+        hostname = parsed.hostname or ''  # 不含端口，如 localhost:4000 -> localhost
+        if hostname in _LOCAL_HOSTS or _IPV4_RE.match(hostname):  # IP地址或localhost
             # 提取 path + query
             path = parsed.path or '/'
             if parsed.query:
@@ -23,5 +27,5 @@ def replace_non_domain(link: str, blog_url: str) -> str:
         else:
             return link  # 合法域名则返回原链接
     except Exception as e:
-        logging.warning(f"替换链接时出错：{link}, error: {e}")
+        logging.warning("替换链接时出错：%s, error: %s", link, e)
         return link
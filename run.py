@@ -8,6 +8,7 @@ from friend_circle_lite.utils.config import load_config
 from friend_circle_lite.utils.mail import send_emails
 from friend_circle_lite.single_friend import get_latest_articles_from_link
 from friend_circle_lite.utils.github import extract_emails_from_issues
+from friend_circle_lite.utils.session import create_session
 
 # ========== 日志设置 ==========
 logging.basicConfig(
@@ -23,6 +24,10 @@ logging.basicConfig(
 # ========== 加载配置 ==========
 config = load_config("./conf.yaml")
 
+# ========== 全局请求会话 ==========
+# 整个运行过程共用一个会话，复用连接池与 keep-alive 连接
+session = create_session()
+
 # ========== 爬虫模块 ==========
 if config["spider_settings"]["enable"]:
     
@@ -30,21 +35,24 @@ if config["spider_settings"]["enable"]:
     json_url = config['spider_settings']['json_url']
     article_count = config['spider_settings']['article_count']
     specific_rss = config['specific_RSS']
+    max_workers = config['spider_settings'].get('max_workers', 20)
 
     logging.info(f"📥 正在从 {json_url} 获取数据，每个博客获取 {article_count} 篇文章")
     result, lost_friends = fetch_and_process_data(
         json_url        = json_url,             # 包含朋友信息的 JSON 文件的 URL。
         specific_RSS    = specific_rss,         # 包含特定 RSS 源的字典列表 [{name, url}]（来自 YAML）。
         count           = article_count,        # 获取每个博客的最大文章数。
-        cache_file      = "./temp/cache.json"   # 缓存文件路径。
+        cache_file      = "./temp/cache.json",  # 缓存文件路径。
+        max_workers     = max_workers,          # 同时处理的博客数量。
+        session         = session               # 复用的请求会话（连接池）。
     )
 
     if config["spider_settings"]["merge_result"]["enable"]:
 
         merge_url = config['spider_settings']["merge_result"]['merge_json_url']
         logging.info(f"🔀 合并功能开启，从 {merge_url} 获取外部数据")
-        result = marge_data_from_json_url(result, f"{merge_url}/all.json")
-        lost_friends = marge_errors_from_json_url(lost_friends, f"{merge_url}/errors.json")
+        result = marge_data_from_json_url(result, f"{merge_url}/all.json", session)
+        lost_friends = marge_errors_from_json_url(lost_friends, f"{merge_url}/errors.json", session)
 
     article_count = len(result.get("article_data", []))
     logging.info(f"📦 数据获取完毕，共有 {article_count} 篇文章，正在处理数据")
@@ -107,7 +115,8 @@ if config["rss_subscribe"]["enable"] and SMTP_isReady:
     latest_articles = get_latest_articles_from_link(
         url=your_blog_url,
         count=5,
-        last_articles_path="./temp/newest_posts.json" # 存储上一次的文章
+        last_articles_path="./temp/newest_posts.json", # 存储上一次的文章
+        session=session
     )
 
     if not latest_articles:
@@ -120,7 +129,7 @@ if config["rss_subscribe"]["enable"] and SMTP_isReady:
             f"?state=closed&label=subscribed&per_page=200"
         )
         logging.info(f"🔎 正在从 GitHub 获取订阅邮箱：{github_api_url}")
-        email_list = extract_emails_from_issues(github_api_url)
+        email_list = extract_emails_from_issues(github_api_url, session)
 
         if not email_list:
             logging.info("⚠️ 无订阅邮箱，请检查格式或是否有订阅者")